@@ -15,9 +15,22 @@ USER_AGENT = (
 # Scraping settings
 DEFAULT_DELAY = 1.0  # seconds between requests
 REQUEST_TIMEOUT = 30  # seconds
+DEFAULT_MAX_WORKERS = 8  # shops scraped concurrently
+
+# Connection pooling and retries
+POOL_CONNECTIONS = 4  # number of host pools to cache
+POOL_MAXSIZE = 32  # keep-alive connections per host
+MAX_RETRIES = 3
+RETRY_BACKOFF_FACTOR = 0.3
+RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+
+# Response cache (opt-in, for development and repeat runs)
+CACHE_NAME = '.leaflet_cache'  # SQLite file, '.sqlite' is appended
+CACHE_EXPIRE_AFTER = 3600  # seconds, unless the server's cache headers say otherwise
 
 # Date settings
 OPEN_ENDED_DATE = '9999-12-31'
+PARSED_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
 
 # German day names
 GERMAN_DAYS = [
@@ -2,9 +2,11 @@
 Exporters for saving data to JSON format.
 """
 
-import json
 import logging
-from typing import List
+import os
+from typing import Iterable, List
+
+import orjson
 
 from .models import Leaflet
 
@@ -20,21 +22,93 @@ class JSONExporter:
         """
         Export leaflets to JSON file.
         
+        Leaflet dataclasses are serialized natively by orjson, without
+        building intermediate dictionaries.
+        
         Args:
             leaflets: List of Leaflet objects
             filename: Output filename
-            indent: JSON indentation (default: 2)
+            indent: JSON indentation (default: 2); orjson only supports
+                    2-space indentation, so any non-zero value indents by 2
             
         Raises:
             IOError: If file writing fails
         """
         try:
-            data = [leaflet.to_dict() for leaflet in leaflets]
+            option = orjson.OPT_INDENT_2 if indent else 0
             
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=indent)
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(leaflets, option=option))
             
             logger.info(f"Exported {len(leaflets)} leaflets to {filename}")
             
         except IOError as e:
-            raise IOError(f"Failed to write JSON file: {e}")
\ No newline at end of file
+            raise IOError(f"Failed to write JSON file: {e}")
+
+    
+    @staticmethod
+    def export_stream(leaflets: Iterable[Leaflet], filename: str, indent: int = 2) -> int:
+        """
+        Export leaflets to JSON file one by one, without building a list.
+        
+        Produces the same output as export(). Leaflets are written to a
+        temporary file next to `filename`, which only replaces it once the
+        iterable is exhausted. If the iterable raises (or the run is
+        interrupted) or yields no leaflets, an existing output file is
+        left untouched.
+        
+        Args:
+            leaflets: Iterable of Leaflet objects (e.g. a generator)
+            filename: Output filename
+            indent: JSON indentation (default: 2); orjson only supports
+                    2-space indentation, so any non-zero value indents by 2
+            
+        Returns:
+            int: Number of exported leaflets (0 means nothing was written)
+            
+        Raises:
+            IOError: If file writing fails
+        """
+        option = orjson.OPT_INDENT_2 if indent else 0
+        opening, separator, closing = (b'[\n  ', b',\n  ', b'\n]') if indent else (b'[', b',', b']')
+        tmp_filename = f"{filename}.{os.getpid()}.tmp"  # same directory, so os.replace is atomic
+        count = 0
+        
+        try:
+            with open(tmp_filename, 'wb') as f:
+                for leaflet in leaflets:
+                    item = orjson.dumps(leaflet, option=option)
+                    if indent:
+                        # Nest the object one level deeper inside the array
+                        item = item.replace(b'\n', b'\n  ')
+                    
+                    f.write(separator if count else opening)
+                    f.write(item)
+                    count += 1
+                
+                if count:
+                    f.write(closing)
+            
+            if count:
+                os.replace(tmp_filename, filename)
+                logger.info(f"Exported {count} leaflets to {filename}")
+            else:
+                os.remove(tmp_filename)
+                logger.info(f"No leaflets to export, {filename} left unchanged")
+            
+            return count
+            
+        except BaseException as e:
+            # Partial output must never replace the previous file
+            if os.path.exists(tmp_filename):
+                os.remove(tmp_filename)
+            
+            # Stop a generator source now (e.g. cancel its queued work) instead of
+            # leaving it suspended in the traceback until interpreter exit
+            close = getattr(leaflets, 'close', None)
+            if close is not None:
+                close()
+            
+            if isinstance(e, IOError):
+                raise IOError(f"Failed to write JSON file: {e}")
+            raise
@@ -3,16 +3,57 @@ Extractors for shops and other data from HTML.
 """
 
 import logging
-from typing import List
+import re
+from html import unescape
+from typing import List, Optional, Pattern
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
 
 from .models import Shop
 
 
 logger = logging.getLogger(__name__)
 
+# Opening tag of the sidebar; everything before it is skipped when parsing.
+# Only a shortcut: pages it misses are parsed in full.
+_SIDEBAR_START_RE = re.compile(r'<div\b[^>]*\bid\s*=\s*["\']?sidebar["\'\s/>]', re.IGNORECASE)
+
+# Flat shop list markup: <ul id="left-category-shops"><li><a href="...">Name</a></li>...</ul>
+_SHOP_LIST_START_RE = re.compile(r'<ul\b[^>]*\bid\s*=\s*["\']?left-category-shops["\'\s/>]', re.IGNORECASE)
+_SHOP_LIST_END_RE = re.compile(r'</ul\s*>', re.IGNORECASE)
+_NESTED_LIST_RE = re.compile(r'<ul\b', re.IGNORECASE)
+_DIV_TAG_RE = re.compile(r'<(/?)div\b', re.IGNORECASE)
+_ANCHOR_RE = re.compile(r'<a\b', re.IGNORECASE)
+_COMMENT_START = '<!--'
+_SHOP_LINK_RE = re.compile(
+    r'<a\b[^>]*?(?<![\w-])href\s*=\s*(?:"([^"]*)"|\'([^\']*)\')[^>]*>\s*([^<]*?)\s*</a\s*>', re.IGNORECASE
+)
+
+# Sidebar selectors
+_SIDEBAR_SELECTOR = 'div#sidebar'
+_SHOP_LINK_SELECTOR = 'ul#left-category-shops li a'
+
+
+def find_tag_start(pattern: Pattern[str], html: str) -> int:
+    """
+    Find the first match of a tag pattern that is not inside an HTML comment.
+    
+    Args:
+        pattern: Compiled regex matching an opening tag
+        html: HTML content
+        
+    Returns:
+        int: Start position of the match, or -1 if there is none
+    """
+    for match in pattern.finditer(html):
+        start = match.start()
+        comment = html.rfind('<!--', 0, start)
+        if comment == -1 or html.find('-->', comment + 4, start) != -1:
+            return start
+    
+    return -1
+
 
 class ShopExtractor:
     """Extractor for shop links from the sidebar menu."""
@@ -25,43 +66,162 @@ class ShopExtractor:
             base_url: Base URL for resolving relative URLs
         """
         self.base_url = base_url
+        self._base_prefix = base_url.rstrip('/')
     
     def extract_shops(self, html: str) -> List[Shop]:
         """
         Extract all shop links from sidebar menu.
         
+        The flat shop list is scanned with a regex first; the HTML parser
+        is only used when the markup doesn't fit that simple shape.
+        
         Args:
             html: HTML content
             
         Returns:
             List of Shop objects
         """
-        soup = BeautifulSoup(html, 'html.parser')
+        # Everything before the sidebar is irrelevant
+        shops = None
+        start = find_tag_start(_SIDEBAR_START_RE, html)
+        if start != -1:
+            sidebar_html = html[start:]
+            
+            shops = self._extract_shops_regex(sidebar_html)
+            if shops is None:
+                logger.debug("Shop list doesn't match the flat markup, falling back to HTML parser")
+                shops = self._extract_shops_tree(sidebar_html)
         
-        # Find the sidebar menu
-        sidebar = soup.select_one('div#sidebar')
-        if not sidebar:
+        # The regex missed the sidebar or was fooled by unusual markup: parse the whole page
+        if not shops and start != 0:
+            shops = self._extract_shops_tree(html)
+        
+        if shops is None:
             logger.warning("Sidebar not found")
             return []
         
-        # Find all shop links
-        shop_links = sidebar.select('ul#left-category-shops li a')
+        logger.info(f"Found {len(shops)} shops in sidebar")
+        return shops
+    
+    def _extract_shops_regex(self, html: str) -> Optional[List[Shop]]:
+        """
+        Extract shop links with a single regex pass over the shop list.
+        
+        Args:
+            html: HTML content starting at the sidebar
+            
+        Returns:
+            List of Shop objects, or None if the markup can't be handled
+        """
+        sidebar_end = self._find_sidebar_end(html)
+        if sidebar_end is None:
+            return None
+        
+        # Only the sidebar itself counts; comments anywhere in it would skew both
+        # the div nesting above and the link matching below
+        html = html[:sidebar_end]
+        if _COMMENT_START in html:
+            return None
+        
+        start = _SHOP_LIST_START_RE.search(html)
+        if not start:
+            return None
+        
+        end = _SHOP_LIST_END_RE.search(html, start.end())
+        if not end:
+            return None
+        
+        shop_list = html[start.end():end.start()]
+        
+        # A nested list would end the slice early
+        if _NESTED_LIST_RE.search(shop_list):
+            return None
+        
+        # Every link must match, otherwise some shops would be silently lost
+        links = _SHOP_LINK_RE.findall(shop_list)
+        if not links or len(links) != len(_ANCHOR_RE.findall(shop_list)):
+            return None
+        
+        # Quotes or '>' in a name mean the tag was split inside an attribute value
+        if any('"' in name or '>' in name for _, _, name in links):
+            return None
         
         shops = []
-        for link in shop_links:
-            name = link.get_text(strip=True)
-            url = link.get('href')
+        for double_quoted, single_quoted, name in links:
+            url = double_quoted or single_quoted
+            # Strip after unescaping, so entities like &nbsp; are trimmed as well
+            shop = self._create_shop(unescape(name).strip(), unescape(url))
+            if shop:
+                shops.append(shop)
+        
+        return shops
+    
+    @staticmethod
+    def _find_sidebar_end(html: str) -> Optional[int]:
+        """
+        Find where the sidebar <div> that opens the HTML closes.
+        
+        Args:
+            html: HTML content starting at the sidebar
             
-            if not url:
-                logger.warning(f"No URL found for shop: {name}")
-                continue
+        Returns:
+            int: Position of the matching </div>, or None if it's not closed
+        """
+        depth = 0
+        for match in _DIV_TAG_RE.finditer(html):
+            depth += -1 if match.group(1) else 1
+            if depth == 0:
+                return match.start()
+        
+        return None
+    
+    def _extract_shops_tree(self, html: str) -> Optional[List[Shop]]:
+        """
+        Extract shop links by parsing the sidebar HTML.
+        
+        Args:
+            html: HTML content starting at the sidebar
             
-            # Ensure absolute URL
-            if not url.startswith('http'):
-                url = urljoin(self.base_url, url)
+        Returns:
+            List of Shop objects, or None if the sidebar is missing
+        """
+        tree = LexborHTMLParser(html)
+        
+        # Find the sidebar menu
+        sidebar = tree.css_first(_SIDEBAR_SELECTOR)
+        if not sidebar:
+            return None
+        
+        # Find all shop links
+        shop_links = sidebar.css(_SHOP_LINK_SELECTOR)
+        
+        shops = []
+        for link in shop_links:
+            shop = self._create_shop(link.text(strip=True), link.attributes.get('href'))
+            if shop:
+                shops.append(shop)
+        
+        return shops
+    
+    def _create_shop(self, name: str, url: Optional[str]) -> Optional[Shop]:
+        """
+        Build a Shop from a link's text and href.
+        
+        Args:
+            name: Shop name
+            url: Link href, possibly relative
             
-            shop = Shop(name=name, url=url)
-            shops.append(shop)
+        Returns:
+            Shop object or None if the link has no URL
+        """
+        if not url:
+            logger.warning(f"No URL found for shop: {name}")
+            return None
         
-        logger.info(f"Found {len(shops)} shops in sidebar")
-        return shops
\ No newline at end of file
+        # Ensure absolute URL; root-relative paths skip urljoin
+        if url.startswith('/') and not url.startswith('//'):
+            url = self._base_prefix + url
+        elif not url.startswith('http'):
+            url = urljoin(self.base_url, url)
+        
+        return Shop(name=name, url=url)
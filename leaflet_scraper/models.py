@@ -2,15 +2,21 @@
 Data models for leaflets and shops.
 """
 
-from dataclasses import dataclass, asdict
-from datetime import datetime
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
 from typing import Dict
 
 from .config import OPEN_ENDED_DATE
 from .exceptions import ValidationException
 
 
-@dataclass
+# Fixed-width formats, cheaper to check than datetime.strptime
+_DATE_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})')  # YYYY-MM-DD
+_DATETIME_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2}) (\d{2}):(\d{2}):(\d{2})')  # YYYY-MM-DD HH:MM:SS
+
+
+@dataclass(slots=True)
 class Leaflet:
     """Data model for a promotional leaflet."""
     title: str
@@ -40,22 +46,32 @@ class Leaflet:
             raise ValidationException("Shop name cannot be empty")
         
         # Validate date formats
+        from_match = _DATE_RE.fullmatch(self.valid_from)
+        if not from_match:
+            raise ValidationException(f"Invalid date format: {self.valid_from}")
+        
+        to_match = _DATE_RE.fullmatch(self.valid_to)
+        if not to_match:
+            raise ValidationException(f"Invalid date format: {self.valid_to}")
+        
+        time_match = _DATETIME_RE.fullmatch(self.parsed_time)
+        if not time_match:
+            raise ValidationException(f"Invalid date format: {self.parsed_time}")
+        
+        # Validate calendar values (e.g. month 13, February 30th)
         try:
-            datetime.strptime(self.valid_from, '%Y-%m-%d')
-            datetime.strptime(self.valid_to, '%Y-%m-%d')
-            datetime.strptime(self.parsed_time, '%Y-%m-%d %H:%M:%S')
+            date(*map(int, from_match.groups()))
+            date(*map(int, to_match.groups()))
+            datetime(*map(int, time_match.groups()))
         except ValueError as e:
             raise ValidationException(f"Invalid date format: {e}")
         
-        # Validate date logic (skip for open-ended leaflets)
-        if self.valid_to != OPEN_ENDED_DATE:
-            from_date = datetime.strptime(self.valid_from, '%Y-%m-%d')
-            to_date = datetime.strptime(self.valid_to, '%Y-%m-%d')
-            
-            if from_date > to_date:
-                raise ValidationException(
-                    f"valid_from ({self.valid_from}) is after valid_to ({self.valid_to})"
-                )
+        # Validate date logic (skip for open-ended leaflets).
+        # Zero-padded ISO dates compare as strings in chronological order.
+        if self.valid_to != OPEN_ENDED_DATE and self.valid_from > self.valid_to:
+            raise ValidationException(
+                f"valid_from ({self.valid_from}) is after valid_to ({self.valid_to})"
+            )
         
         return True
     
@@ -65,10 +81,17 @@ class Leaflet:
     
     def to_dict(self) -> Dict:
         """Convert leaflet to dictionary."""
-        return asdict(self)
+        return {
+            'title': self.title,
+            'thumbnail': self.thumbnail,
+            'shop_name': self.shop_name,
+            'valid_from': self.valid_from,
+            'valid_to': self.valid_to,
+            'parsed_time': self.parsed_time,
+        }
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Shop:
     """Data model for a shop."""
     name: str
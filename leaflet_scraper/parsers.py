@@ -5,18 +5,105 @@ Parsers for dates and leaflet HTML elements.
 import logging
 import re
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional, Tuple
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborNode
 
-from .config import GERMAN_DAYS, OPEN_ENDED_DATE
+from .config import GERMAN_DAYS, OPEN_ENDED_DATE, PARSED_TIME_FORMAT
 from .exceptions import ParsingException
 from .models import Leaflet
 
 
 logger = logging.getLogger(__name__)
 
+# Date patterns, compiled once at import
+_DATE_PREFIXES = ['von', 'ab', 'seit']
+_NOISE_WORDS_RE = re.compile(r'\b(?:' + '|'.join(GERMAN_DAYS + _DATE_PREFIXES) + r')\b', re.IGNORECASE)
+_RANGE_RE = re.compile(r'(\d{2})\.(\d{2})\.(\d{4})?\s*-\s*(\d{2})\.(\d{2})\.(\d{4})')  # DD.MM.[YYYY] - DD.MM.YYYY
+_SINGLE_RE = re.compile(r'(\d{2})\.(\d{2})\.(\d{4})')  # DD.MM.YYYY
+
+# Leaflet element selectors
+_TITLE_SELECTOR = 'h2'
+_THUMBNAIL_SELECTOR = 'div.image-wrapper img, figure img'
+_SHOP_NAME_SELECTOR = 'span.shop-name'
+_DATE_HIDDEN_SELECTOR = 'span.hidden-sm'  # full date format
+_DATE_VISIBLE_SELECTOR = 'span.visible-sm'
+
+
+def _thumbnail_rank(img_elem: LexborNode) -> int:
+    """
+    Rank a thumbnail candidate by the fallback strategy that finds it.
+    
+    Returns:
+        int: 0 for an image in a <picture> inside the image wrapper,
+             1 for any other image in the wrapper, 2 for an image in a figure
+    """
+    rank = 2
+    in_picture = False
+    
+    node = img_elem.parent
+    while node is not None:
+        if node.tag == 'picture':
+            in_picture = True
+        elif node.tag == 'div' and 'image-wrapper' in (node.attributes.get('class') or '').split():
+            if in_picture:
+                return 0
+            rank = 1
+        node = node.parent
+    
+    return rank
+
+
+@lru_cache(maxsize=4096)
+def _parse_date_range(date_string: str, current_year: int) -> Tuple[str, str]:
+    """
+    Memoized implementation of DateParser.parse_date_range.
+    
+    Leaflets on a page (and across shops) mostly share the same few date
+    strings, so repeated inputs are answered from the cache. Failures are
+    not cached and raise again on every call.
+    """
+    try:
+        # Clean the string
+        original_string = date_string
+        date_string = date_string.strip()
+        
+        # Remove day names (Montag, Dienstag, etc.) and common prefixes in one pass
+        date_string = _NOISE_WORDS_RE.sub('', date_string)
+        date_string = date_string.strip()
+        
+        # Pattern 1: DD.MM.YYYY - DD.MM.YYYY or short DD.MM. - DD.MM.YYYY
+        match = _RANGE_RE.search(date_string)
+        
+        if match:
+            day1, month1, year1, day2, month2, year2 = match.groups()
+            
+            # Short format: start year is implied by the end date
+            if year1 is None:
+                year1 = year2 if int(month1) <= int(month2) else str(int(year2) - 1)
+            
+            valid_from = f"{year1}-{month1}-{day1}"
+            valid_to = f"{year2}-{month2}-{day2}"
+            return valid_from, valid_to
+        
+        # Pattern 2: Single date DD.MM.YYYY (open-ended)
+        match = _SINGLE_RE.search(date_string)
+        
+        if match:
+            day, month, year = match.groups()
+            valid_from = f"{year}-{month}-{day}"
+            valid_to = OPEN_ENDED_DATE
+            return valid_from, valid_to
+        
+        raise ParsingException(f"Unsupported date format: {original_string}")
+        
+    except ParsingException:
+        raise
+    except Exception as e:
+        raise ParsingException(f"Failed to parse date range '{original_string}': {e}")
+
 
 class DateParser:
     """Parser for German date formats."""
@@ -46,216 +133,157 @@ class DateParser:
         if current_year is None:
             current_year = datetime.now().year
         
-        try:
-            # Clean the string
-            original_string = date_string
-            date_string = date_string.strip()
-            
-            # Remove day names (Montag, Dienstag, etc.)
-            for day in GERMAN_DAYS:
-                date_string = re.sub(r'\b' + day + r'\b', '', date_string, flags=re.IGNORECASE)
-            
-            # Remove common prefixes
-            date_string = re.sub(r'\b(von|ab|seit)\b', '', date_string, flags=re.IGNORECASE)
-            date_string = date_string.strip()
-            
-            # Pattern 1: DD.MM.YYYY - DD.MM.YYYY
-            pattern1 = r'(\d{2})\.(\d{2})\.(\d{4})\s*-\s*(\d{2})\.(\d{2})\.(\d{4})'
-            match = re.search(pattern1, date_string)
-            
-            if match:
-                day1, month1, year1, day2, month2, year2 = match.groups()
-                valid_from = f"{year1}-{month1}-{day1}"
-                valid_to = f"{year2}-{month2}-{day2}"
-                return valid_from, valid_to
-            
-            # Pattern 2: DD.MM. - DD.MM.YYYY
-            pattern2 = r'(\d{2})\.(\d{2})\.\s*-\s*(\d{2})\.(\d{2})\.(\d{4})'
-            match = re.search(pattern2, date_string)
-            
-            if match:
-                day1, month1, day2, month2, year2 = match.groups()
-                year1 = year2 if int(month1) <= int(month2) else str(int(year2) - 1)
-                valid_from = f"{year1}-{month1}-{day1}"
-                valid_to = f"{year2}-{month2}-{day2}"
-                return valid_from, valid_to
-            
-            # Pattern 3: Single date DD.MM.YYYY (open-ended)
-            pattern3 = r'(\d{2})\.(\d{2})\.(\d{4})'
-            match = re.search(pattern3, date_string)
-            
-            if match:
-                day, month, year = match.groups()
-                valid_from = f"{year}-{month}-{day}"
-                valid_to = OPEN_ENDED_DATE
-                
-                logger.info(f"Open-ended leaflet detected: '{original_string}' → {valid_from} to {valid_to}")
-                return valid_from, valid_to
-            
-            raise ParsingException(f"Unsupported date format: {original_string}")
-            
-        except ParsingException:
-            raise
-        except Exception as e:
-            raise ParsingException(f"Failed to parse date range '{original_string}': {e}")
+        valid_from, valid_to = _parse_date_range(date_string, current_year)
+        
+        if valid_to == OPEN_ENDED_DATE:
+            logger.info(f"Open-ended leaflet detected: '{date_string}' → {valid_from} to {valid_to}")
+        
+        return valid_from, valid_to
 
 
 class LeafletParser:
     """Parser for individual leaflet HTML elements."""
     
-    def __init__(self, base_url: str, debug: bool = False):
+    def __init__(self, base_url: str):
         """
         Initialize parser.
         
+        Debug output is controlled by the level of this module's logger.
+        
         Args:
             base_url: Base URL for resolving relative URLs
-            debug: Enable debug mode with detailed logging
         """
         self.base_url = base_url
+        self._base_prefix = base_url.rstrip('/')
         self.date_parser = DateParser()
-        self.debug = debug
     
-    def _extract_thumbnail(self, element: BeautifulSoup) -> Optional[str]:
+    def _extract_thumbnail(self, element: LexborNode) -> Optional[str]:
         """
         Extract thumbnail URL with multiple fallback strategies.
         
+        Looks for an image inside the image wrapper's <picture>, then any
+        image inside the image wrapper, then an image inside a <figure>,
+        reading 'src', then 'data-src' (lazy loading), then the first
+        'srcset' entry.
+        
         Args:
-            element: BeautifulSoup element
+            element: Lexbor node
             
         Returns:
             str: Thumbnail URL or None
         """
-        # Strategy 1: Standard selector
-        img_elem = element.select_one('div.image-wrapper picture img')
+        # All fallback locations in one traversal, then tried in strategy order
+        # (sorting is stable, so document order is kept within a strategy)
+        candidates = element.css(_THUMBNAIL_SELECTOR)
+        if len(candidates) > 1:
+            candidates.sort(key=_thumbnail_rank)
         
-        if img_elem:
+        for img_elem in candidates:
             # Try src attribute
-            thumbnail = img_elem.get('src')
+            thumbnail = img_elem.attributes.get('src')
             if thumbnail:
-                if self.debug:
-                    logger.debug(f"Found thumbnail in 'src': {thumbnail}")
+                logger.debug("Found thumbnail in 'src': %s", thumbnail)
                 return thumbnail
             
             # Try data-src (lazy loading)
-            thumbnail = img_elem.get('data-src')
+            thumbnail = img_elem.attributes.get('data-src')
             if thumbnail:
-                if self.debug:
-                    logger.debug(f"Found thumbnail in 'data-src': {thumbnail}")
+                logger.debug("Found thumbnail in 'data-src': %s", thumbnail)
                 return thumbnail
             
             # Try srcset
-            srcset = img_elem.get('srcset')
+            srcset = img_elem.attributes.get('srcset')
             if srcset:
                 # Extract first URL from srcset
                 thumbnail = srcset.split(',')[0].split()[0]
-                if self.debug:
-                    logger.debug(f"Found thumbnail in 'srcset': {thumbnail}")
-                return thumbnail
-        
-        # Strategy 2: Try without picture wrapper
-        img_elem = element.select_one('div.image-wrapper img')
-        if img_elem:
-            thumbnail = img_elem.get('src') or img_elem.get('data-src')
-            if thumbnail:
-                if self.debug:
-                    logger.debug(f"Found thumbnail without picture wrapper: {thumbnail}")
-                return thumbnail
-        
-        # Strategy 3: Try any img in figure
-        img_elem = element.select_one('figure img')
-        if img_elem:
-            thumbnail = img_elem.get('src') or img_elem.get('data-src')
-            if thumbnail:
-                if self.debug:
-                    logger.debug(f"Found thumbnail in figure: {thumbnail}")
+                logger.debug("Found thumbnail in 'srcset': %s", thumbnail)
                 return thumbnail
         
-        # Debug: Print element structure if debugging is enabled
-        if self.debug:
+        # Debug: Print element structure (serializing the node is not free)
+        if logger.isEnabledFor(logging.DEBUG):
             logger.debug("Failed to find thumbnail. Element structure:")
-            logger.debug(element.prettify()[:500])
+            logger.debug(element.html[:500])
         
         return None
     
-    def parse(self, element: BeautifulSoup, shop_name: str = None, index: int = 0) -> Optional[Leaflet]:
+    def parse(self, element: LexborNode, shop_name: str = None, index: int = 0,
+              parsed_time: str = None) -> Optional[Leaflet]:
         """
         Parse a single leaflet element.
         
         Args:
-            element: BeautifulSoup element containing leaflet data
+            element: Lexbor node containing leaflet data
             shop_name: Override shop name from element
             index: Element index for debugging
+            parsed_time: Timestamp shared by a batch of leaflets (default: now)
             
         Returns:
             Leaflet object or None if parsing fails
         """
         try:
-            if self.debug:
-                logger.debug(f"\n{'='*60}\nParsing leaflet #{index}\n{'='*60}")
+            logger.debug("\n%s\nParsing leaflet #%d\n%s", '=' * 60, index, '=' * 60)
             
             # Extract title
-            title_elem = element.select_one('h2')
+            title_elem = element.css_first(_TITLE_SELECTOR)
             if not title_elem:
                 logger.warning(f"Leaflet #{index}: Title element not found")
                 return None
-            title = title_elem.get_text(strip=True)
+            title = title_elem.text(strip=True)
             
-            if self.debug:
-                logger.debug(f"Title: {title}")
+            logger.debug("Title: %s", title)
             
             # Extract thumbnail with improved logic
             thumbnail = self._extract_thumbnail(element)
             
             if not thumbnail:
                 logger.warning(f"Leaflet #{index} ({title}): Thumbnail image not found")
-                if self.debug:
+                if logger.isEnabledFor(logging.DEBUG):
                     # Print available img tags
-                    all_imgs = element.find_all('img')
-                    logger.debug(f"Found {len(all_imgs)} img tags in element:")
+                    all_imgs = element.css('img')
+                    logger.debug("Found %d img tags in element:", len(all_imgs))
                     for img in all_imgs:
-                        logger.debug(f"  - {img.attrs}")
+                        logger.debug("  - %s", img.attributes)
                 return None
             
-            # Ensure absolute URL
-            if not thumbnail.startswith('http'):
+            # Ensure absolute URL; root-relative paths skip urljoin
+            if thumbnail.startswith('/') and not thumbnail.startswith('//'):
+                thumbnail = self._base_prefix + thumbnail
+            elif not thumbnail.startswith('http'):
                 thumbnail = urljoin(self.base_url, thumbnail)
             
-            if self.debug:
-                logger.debug(f"Thumbnail: {thumbnail}")
+            logger.debug("Thumbnail: %s", thumbnail)
             
             # Extract shop name (use override if provided)
             if not shop_name:
-                shop_name_elem = element.select_one('span.shop-name')
+                shop_name_elem = element.css_first(_SHOP_NAME_SELECTOR)
                 if not shop_name_elem:
                     logger.warning(f"Leaflet #{index}: Shop name element not found")
                     return None
-                shop_name = shop_name_elem.get_text(strip=True)
+                shop_name = shop_name_elem.text(strip=True)
             
-            if self.debug:
-                logger.debug(f"Shop: {shop_name}")
+            logger.debug("Shop: %s", shop_name)
             
             # Extract date range
             # Try hidden-sm first (full format), then visible-sm
-            date_elem = element.select_one('span.hidden-sm')
-            if not date_elem or not date_elem.get_text(strip=True):
-                date_elem = element.select_one('span.visible-sm')
+            date_elem = element.css_first(_DATE_HIDDEN_SELECTOR)
+            if not date_elem or not date_elem.text(strip=True):
+                date_elem = element.css_first(_DATE_VISIBLE_SELECTOR)
             
             if not date_elem:
                 logger.warning(f"Leaflet #{index}: Date element not found")
                 return None
             
-            date_string = date_elem.get_text(strip=True)
+            date_string = date_elem.text(strip=True)
             
-            if self.debug:
-                logger.debug(f"Raw date string: {date_string}")
+            logger.debug("Raw date string: %s", date_string)
             
             valid_from, valid_to = self.date_parser.parse_date_range(date_string)
             
-            if self.debug:
-                logger.debug(f"Dates: {valid_from} to {valid_to}")
+            logger.debug("Dates: %s to %s", valid_from, valid_to)
             
-            # Current timestamp
-            parsed_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            # Current timestamp unless the caller provides one for the whole batch
+            if parsed_time is None:
+                parsed_time = datetime.now().strftime(PARSED_TIME_FORMAT)
             
             # Create and validate leaflet object
             leaflet = Leaflet(
@@ -269,13 +297,11 @@ class LeafletParser:
             
             leaflet.validate()
             
-            if self.debug:
-                logger.debug(f"✓ Successfully parsed leaflet #{index}")
+            logger.debug("✓ Successfully parsed leaflet #%d", index)
             
             return leaflet
             
         except Exception as e:
             logger.error(f"Failed to parse leaflet #{index}: {e}")
-            if self.debug:
-                logger.exception(e)
+            logger.debug("Traceback for leaflet #%d:", index, exc_info=True)
             return None
\ No newline at end of file
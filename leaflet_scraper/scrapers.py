@@ -3,43 +3,147 @@ Main scraper logic.
 """
 
 import logging
+import re
+import threading
 import time
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Iterator, List, Optional
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from selectolax.lexbor import LexborHTMLParser, LexborNode
+from urllib3.util.retry import Retry
 
-from .config import BASE_URL, HYPERMARKETS_URL, USER_AGENT, DEFAULT_DELAY, REQUEST_TIMEOUT
+from .config import (
+    BASE_URL, HYPERMARKETS_URL, USER_AGENT, DEFAULT_DELAY, REQUEST_TIMEOUT, DEFAULT_MAX_WORKERS,
+    PARSED_TIME_FORMAT,
+    POOL_CONNECTIONS, POOL_MAXSIZE, MAX_RETRIES, RETRY_BACKOFF_FACTOR, RETRY_STATUS_CODES,
+    CACHE_NAME, CACHE_EXPIRE_AFTER
+)
 from .exceptions import ScraperException, FetchException
-from .extractors import ShopExtractor
+from .extractors import ShopExtractor, find_tag_start
 from .models import Leaflet, Shop
 from .parsers import LeafletParser
 
 
 logger = logging.getLogger(__name__)
 
+# Leaflet grid selectors
+_GRID_SELECTOR = 'div.letaky-grid'
+_LEAFLET_SELECTOR = 'div.brochure-thumb.grid-item'
+
+# Opening tag of the leaflet grid; everything before it is skipped when parsing.
+# Only a shortcut: pages it misses are parsed in full.
+_GRID_START_RE = re.compile(
+    r'<div\b[^>]*\bclass\s*=\s*["\'][^"\']*(?<![\w-])letaky-grid(?![\w-])', re.IGNORECASE
+)
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing requests at least `interval` seconds apart."""
+    
+    def __init__(self, interval: float):
+        """
+        Initialize limiter.
+        
+        Args:
+            interval: Minimum delay between requests in seconds
+        """
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+    
+    def wait(self) -> None:
+        """Block until the caller is allowed to send the next request."""
+        if self.interval <= 0:
+            return
+        
+        # Reserve a slot under the lock, sleep outside of it
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_time)
+            self._next_time = slot + self.interval
+        
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """HTTP adapter that waits on a rate limiter before each network request."""
+    
+    def __init__(self, rate_limiter: RateLimiter, **kwargs):
+        """
+        Initialize adapter.
+        
+        Args:
+            rate_limiter: Limiter shared by all requests of the session
+            **kwargs: Passed through to HTTPAdapter
+        """
+        self.rate_limiter = rate_limiter
+        super().__init__(**kwargs)
+    
+    def send(self, request, **kwargs):
+        """Send the request once the rate limiter allows it."""
+        # Cached responses never reach the adapter, so only real requests are delayed
+        self.rate_limiter.wait()
+        return super().send(request, **kwargs)
+
 
 class LeafletScraper:
     """Main scraper class for prospektmaschine.de."""
     
-    def __init__(self, debug: bool = False, delay: float = DEFAULT_DELAY):
+    def __init__(self, debug: bool = False, delay: float = DEFAULT_DELAY,
+                 max_workers: int = DEFAULT_MAX_WORKERS, cache: bool = False):
         """
         Initialize scraper.
         
         Args:
             debug: Enable debug mode with detailed logging
-            delay: Delay between requests in seconds
+            delay: Delay between requests in seconds (shared by all workers)
+            max_workers: Number of shops scraped concurrently
+            cache: Cache responses on disk between runs (honours server cache headers)
         """
         self.debug = debug
         self.delay = delay
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(delay)
         
         if debug:
-            logger.setLevel(logging.DEBUG)
+            # Package-level logger, so parser and extractor debug output shows too
+            logging.getLogger(__package__).setLevel(logging.DEBUG)
         
-        self.session = requests.Session()
+        if cache:
+            # Optional feature, so don't pay for the import unless it's used
+            from requests_cache import CachedSession
+            
+            self.session = CachedSession(
+                CACHE_NAME,
+                expire_after=CACHE_EXPIRE_AFTER,
+                stale_if_error=True,
+                cache_control=True
+            )
+        else:
+            self.session = requests.Session()
         self.session.headers.update({'User-Agent': USER_AGENT})
         
-        self.leaflet_parser = LeafletParser(BASE_URL, debug=debug)
+        # Keep-alive connection pool with retries on transient errors; the delay
+        # is applied here so cache hits are served without waiting
+        retry = Retry(
+            total=MAX_RETRIES,
+            backoff_factor=RETRY_BACKOFF_FACTOR,
+            status_forcelist=RETRY_STATUS_CODES
+        )
+        adapter = RateLimitedAdapter(
+            self.rate_limiter,
+            pool_connections=POOL_CONNECTIONS,
+            pool_maxsize=POOL_MAXSIZE,
+            max_retries=retry
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        self.leaflet_parser = LeafletParser(BASE_URL)
         self.shop_extractor = ShopExtractor(BASE_URL)
     
     def fetch_page(self, url: str) -> str:
@@ -59,21 +163,43 @@ class LeafletScraper:
             logger.info(f"Fetching page: {url}")
             response = self.session.get(url, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
-            response.encoding = response.apparent_encoding
+            
+            # Use the charset from Content-Type instead of detecting it from the
+            # body; without one requests falls back to ISO-8859-1, the site is UTF-8
+            if 'charset' not in response.headers.get('Content-Type', '').lower():
+                response.encoding = 'utf-8'
+            
+            html = response.text
             
             if self.debug:
                 logger.debug(f"Response status: {response.status_code}")
-                logger.debug(f"Response length: {len(response.text)} characters")
+                logger.debug(f"Response length: {len(html)} characters")
             
-            # Delay to be polite to the server
-            if self.delay > 0:
-                time.sleep(self.delay)
-            
-            return response.text
+            return html
             
         except requests.RequestException as e:
             raise FetchException(f"Failed to fetch page: {e}")
     
+    def _select_leaflet_elements(self, html: str) -> Optional[List[LexborNode]]:
+        """
+        Parse HTML and select the leaflet elements inside the grid container.
+        
+        Args:
+            html: HTML content
+            
+        Returns:
+            List of leaflet nodes, or None if the container is missing
+        """
+        tree = LexborHTMLParser(html)
+        
+        # Find the main container
+        container = tree.css_first(_GRID_SELECTOR)
+        if not container:
+            return None
+        
+        # Find all leaflet elements
+        return container.css(_LEAFLET_SELECTOR)
+    
     def extract_leaflets_from_page(self, html: str, shop_name: str = None) -> List[Leaflet]:
         """
         Extract all leaflets from HTML page.
@@ -85,26 +211,34 @@ class LeafletScraper:
         Returns:
             List of Leaflet objects
         """
-        soup = BeautifulSoup(html, 'html.parser')
+        # Only parse from the grid onwards, skipping <head>, header and navigation
+        leaflet_elements = None
+        start = find_tag_start(_GRID_START_RE, html)
+        if start != -1:
+            leaflet_elements = self._select_leaflet_elements(html[start:])
         
-        # Find the main container
-        container = soup.select_one('div.letaky-grid')
-        if not container:
+        # The regex missed the grid or was fooled by unusual markup: parse the whole page
+        if not leaflet_elements and start != 0:
+            leaflet_elements = self._select_leaflet_elements(html)
+        
+        if leaflet_elements is None:
             logger.debug("Main container 'letaky-grid' not found")
             return []
         
-        # Find all leaflet elements
-        leaflet_elements = container.select('div.brochure-thumb.grid-item')
-        
         if not leaflet_elements:
             logger.debug("No leaflet elements found")
             return []
         
         logger.debug(f"Found {len(leaflet_elements)} leaflet elements")
         
+        # One timestamp for the whole page
+        parsed_time = datetime.now().strftime(PARSED_TIME_FORMAT)
+        
         leaflets = []
         for idx, element in enumerate(leaflet_elements, 1):
-            leaflet = self.leaflet_parser.parse(element, shop_name=shop_name, index=idx)
+            leaflet = self.leaflet_parser.parse(
+                element, shop_name=shop_name, index=idx, parsed_time=parsed_time
+            )
             
             if leaflet:
                 leaflets.append(leaflet)
@@ -142,12 +276,16 @@ class LeafletScraper:
             logger.error(f"Failed to scrape shop {shop.name}: {e}")
             return []
     
-    def scrape_all_shops(self) -> List[Leaflet]:
+    def scrape_all_shops_iter(self) -> Iterator[Leaflet]:
         """
-        Scrape all leaflets from all shops.
+        Scrape all leaflets from all shops, yielding them as they are ready.
         
-        Returns:
-            List of all Leaflet objects
+        Shops are scraped concurrently and their leaflets are yielded in
+        sidebar order, so callers can process them without collecting the
+        whole crawl in memory.
+        
+        Yields:
+            Leaflet objects
             
         Raises:
             ScraperException: If scraping fails
@@ -162,37 +300,55 @@ class LeafletScraper:
         
         logger.info(f"Starting to scrape {len(shops)} shops")
         
-        # Scrape each shop
-        all_leaflets = []
+        total_leaflets = 0
         successful_shops = 0
         failed_shops = 0
         open_ended_total = 0
         
-        for idx, shop in enumerate(shops, 1):
-            logger.info(f"\n[{idx}/{len(shops)}] Processing: {shop.name}")
-            
-            leaflets = self.scrape_shop(shop)
+        # Scrape shops concurrently; requests are still spaced by the rate limiter.
+        # map() returns results in sidebar order so the output is deterministic.
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            results = executor.map(self.scrape_shop, shops)
             
-            if leaflets:
-                all_leaflets.extend(leaflets)
-                successful_shops += 1
-                open_ended_total += sum(1 for l in leaflets if l.is_open_ended())
-            else:
-                failed_shops += 1
+            for idx, (shop, leaflets) in enumerate(zip(shops, results), 1):
+                logger.info(f"[{idx}/{len(shops)}] Processed: {shop.name}")
+                
+                if leaflets:
+                    total_leaflets += len(leaflets)
+                    successful_shops += 1
+                    open_ended_total += sum(1 for l in leaflets if l.is_open_ended())
+                else:
+                    failed_shops += 1
+                
+                yield from leaflets
+        finally:
+            # If the consumer stops early, don't keep scraping the queued shops
+            executor.shutdown(wait=True, cancel_futures=True)
         
-        regular_total = len(all_leaflets) - open_ended_total
+        regular_total = total_leaflets - open_ended_total
         
         logger.info(f"\n{'='*60}")
         logger.info(f"Scraping completed!")
         logger.info(f"Total shops processed: {len(shops)}")
         logger.info(f"Shops with leaflets: {successful_shops}")
         logger.info(f"Shops without leaflets: {failed_shops}")
-        logger.info(f"Total leaflets collected: {len(all_leaflets)}")
+        logger.info(f"Total leaflets collected: {total_leaflets}")
         logger.info(f"  - Regular leaflets: {regular_total}")
         logger.info(f"  - Open-ended leaflets: {open_ended_total}")
         logger.info(f"{'='*60}\n")
+    
+    def scrape_all_shops(self) -> List[Leaflet]:
+        """
+        Scrape all leaflets from all shops.
         
-        return all_leaflets
+        Returns:
+            List of all Leaflet objects
+            
+        Raises:
+            ScraperException: If scraping fails
+        """
+        return list(self.scrape_all_shops_iter())
     
     def scrape(self) -> List[Leaflet]:
         """
@@ -23,25 +23,24 @@ def main():
     debug = False
     output_file = 'leaflets.json'
     delay = 1.0
+    max_workers = 8
+    cache = False
     
     try:
         logger.info("Starting leaflet scraper for all hypermarket chains")
         
         # Initialize scraper
-        scraper = LeafletScraper(debug=debug, delay=delay)
+        scraper = LeafletScraper(debug=debug, delay=delay, max_workers=max_workers, cache=cache)
         
-        # Scrape all leaflets
-        leaflets = scraper.scrape()
+        # Scrape all leaflets, streaming them straight into the JSON file
+        exporter = JSONExporter()
+        count = exporter.export_stream(scraper.scrape_all_shops_iter(), output_file)
         
-        if not leaflets:
+        if not count:
             logger.error("No leaflets were found")
             return
         
-        # Export to JSON
-        exporter = JSONExporter()
-        exporter.export(leaflets, output_file)
-        
-        logger.info(f"✓ Scraping completed successfully. Total leaflets: {len(leaflets)}")
+        logger.info(f"✓ Scraping completed successfully. Total leaflets: {count}")
         
     except ScraperException as e:
         logger.error(f"Scraping failed: {e}")